@@ -5,32 +5,106 @@ This library provides utilities that are used often in several scripts
 Functions:
 - output_file_path: Build an output file path based on an input file.
 - check_file: Validate the existence of a file.
+- log_to_file: Send the messages of the library logger to a log file.
 - redirect_output: Context manager to capture stdout and stderr to a log.
+- bbox_corners: Build the array of the 8 corners of a bounding box.
+- plane_misses_bbox: Check whether a plane leaves a bounding box on one side.
+- filter_candidate_planes: Select the planes crossing a bounding box.
 
 """
 import os
 import sys
+import atexit
+import logging
+import functools
+import itertools
 from contextlib import contextmanager
 
+import numpy as np
+
+##########################################
+
+# Compiled numba kernel of filter_candidate_planes: None until the first
+# call, False if numba is not installed
+_filter_candidate_planes_numba = None
+
+# Logger for the messages of the scripts and libraries
+logger = logging.getLogger("icomat")
+
+# If set to 1, redirect_output leaves the output of OCC untouched
+no_occ_log = os.environ.get("ICOMAT_NO_OCC_LOG") == "1"
+
+# Number of redirect_output contexts currently entered
+_redirect_depth = 0
+
+# Log file descriptors opened by redirect_output, by absolute path.
+# They are kept open for the whole process on POSIX systems only, elsewhere
+# an open file may not be renamed or deleted by other processes.
+_log_fds = {}
+_keep_log_fds = os.name == "posix"
+
+##########################################
+
+def _get_log_fd(path):
+    """
+    Returns a file descriptor opened in append mode on the given log file.
+
+    On POSIX systems the descriptor is opened once per path and cached.
+
+    Parameters:
+        path (str): Path to the log file.
+
+    Returns:
+        int: File descriptor of the log file.
+    """
+
+    key = os.path.abspath(path)
+    fd  = _log_fds.get(key)
+
+    if fd is None:
+        fd = os.open(key, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if _keep_log_fds:
+            _log_fds[key] = fd
+
+    return fd
+
+##########################################
+
+def _close_all_logs():
+    """
+    Closes the log file descriptors cached by _get_log_fd.
+
+    Returns:
+        None
+    """
+
+    while _log_fds:
+        _, fd = _log_fds.popitem()
+        os.close(fd)
+
+    return
+
+atexit.register(_close_all_logs)
+
 ##########################################
 
+@functools.lru_cache(maxsize=32)
 def output_file_path(input_file, filename):
     """
     Generates an output file path in the same directory as the input file,
     using the provided filename.
 
+    The result is cached, as the same paths are built on every log redirection.
+
     Parameters:
-        input_file (str): Path to an existing file (e.g., STEP file).
+        input_file (str or os.PathLike): Path to an existing file (e.g., STEP file).
         filename (str): Filename to use for the output (e.g., log file name).
 
     Returns:
         str: Full path combining the directory of input_file and filename.
     """
 
-    root, file  = os.path.split(input_file)
-    output_file = os.path.join(root, filename)
-
-    return output_file
+    return os.path.join(os.path.dirname(os.fspath(input_file)), filename)
 
 ##########################################
 
@@ -54,37 +128,233 @@ def check_file(path):
 
 ##########################################
 
+def log_to_file(logfile_path):
+    """
+    Writes the messages of the library logger to the specified log file.
+
+    Calling it again with the same file does not add another handler.
+
+    Parameters:
+        logfile_path (str): Path to the log file.
+
+    Returns:
+        None
+    """
+
+    logfile_path = os.path.abspath(logfile_path)
+
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == logfile_path:
+            return
+
+    handler = logging.FileHandler(logfile_path, delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    return
+
+##########################################
+
 @contextmanager
-def redirect_output(logfile_path):
+def redirect_output(log):
     """
     Context manager to redirect stdout and stderr to the specified log file.
 
-    All output printed inside the context
+    All output printed inside the context, including the output of
+    C/C++ libraries writing directly to the file descriptors,
     will be written to the log file instead of the terminal.
 
+    It is meant for the native output of OCC only, messages of the scripts
+    go through the library logger (see log_to_file).
+
+    Nested contexts are no-ops: their output goes to the log file of the
+    outermost context, so wrapping a whole sequence of calls in a single
+    context only pays for the redirection once. The whole context is a
+    no-op if the ICOMAT_NO_OCC_LOG environment variable is set to 1.
+
     Parameters:
-        logfile_path (str): Path to the log file.
+        log (str, file object or int): Path to the log file, or an already
+            opened file object or file descriptor, which is left open for
+            the caller. On POSIX systems a path is opened once in append
+            mode and kept open until the process exits; on other systems
+            it is opened and closed by each context.
 
     Usage:
         with redirect_output("my_log.txt"):
             # code whose output you want to capture
             ...
     """
-    saved_stdout_fd = os.dup(sys.stdout.fileno())
-    saved_stderr_fd = os.dup(sys.stderr.fileno())
+    global _redirect_depth
 
-    with open(logfile_path, 'a') as log_file:
+    if no_occ_log or _redirect_depth > 0:
+        _redirect_depth += 1
         try:
-            os.dup2(log_file.fileno(), sys.stdout.fileno())
-            os.dup2(log_file.fileno(), sys.stderr.fileno())
             yield
         finally:
-            os.dup2(saved_stdout_fd, sys.stdout.fileno())
-            os.dup2(saved_stderr_fd, sys.stderr.fileno())
-            os.close(saved_stdout_fd)
-            os.close(saved_stderr_fd)
+            _redirect_depth -= 1
+        return
+
+    if isinstance(log, int):
+        log_fd, owned = log, False
+    elif hasattr(log, "fileno"):
+        log_fd, owned = log.fileno(), False
+    else:
+        log_fd = _get_log_fd(log)
+        owned  = not _keep_log_fds
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    saved_stdout_fd = os.dup(sys.stdout.fileno())
+    saved_stderr_fd = os.dup(sys.stderr.fileno())
+
+    _redirect_depth += 1
+    try:
+        os.dup2(log_fd, sys.stdout.fileno())
+        os.dup2(log_fd, sys.stderr.fileno())
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_stdout_fd, sys.stdout.fileno())
+        os.dup2(saved_stderr_fd, sys.stderr.fileno())
+        os.close(saved_stdout_fd)
+        os.close(saved_stderr_fd)
+        if owned:
+            os.close(log_fd)
+        _redirect_depth -= 1
 
 ##########################################
 
-            
+def bbox_corners(bbox):
+    """
+    Builds the corners of a bounding box.
+
+    Parameters:
+        bbox (tuple): Limits (xmin, ymin, zmin, xmax, ymax, zmax) of the box.
+
+    Returns:
+        numpy.ndarray: (8, 3) array with the coordinates of the corners.
+    """
+
+    xmin, ymin, zmin, xmax, ymax, zmax = bbox
+
+    return np.array(list(itertools.product([xmin, xmax], [ymin, ymax], [zmin, zmax])), dtype=np.float64)
+
+##########################################
+
+def plane_misses_bbox(bbox, point, normal):
+    """
+    Checks whether a plane leaves a whole bounding box on one of its sides.
+
+    The plane equation is evaluated at the 8 corners of the box in a single
+    vectorized product; if all values have the same sign the plane does not
+    cross the box.
+
+    Parameters:
+        bbox (tuple): Limits (xmin, ymin, zmin, xmax, ymax, zmax) of the box.
+        point (array-like): [x, y, z] coordinates of a point on the plane.
+        normal (array-like): [nx, ny, nz] normal vector of the plane.
+
+    Returns:
+        bool: True if the plane does not cross the box; False otherwise.
+    """
+
+    corners = bbox_corners(bbox)
+    n       = np.asarray(normal, dtype=np.float64)
+    p       = np.asarray(point, dtype=np.float64)
+
+    d = (corners - p) @ n
+
+    return bool(d.min() * d.max() > 0)
+
+##########################################
+
+def _filter_candidate_planes_numpy(corners, planes):
+    """
+    NumPy implementation of filter_candidate_planes.
+    """
+
+    normals = planes[:, 3:]
+    offsets = np.einsum("ij,ij->i", planes[:, :3], normals)
+
+    # Plane equation at every corner (rows) for every plane (columns)
+    d = corners @ normals.T - offsets
+
+    return d.min(axis=0) * d.max(axis=0) <= 0
+
+##########################################
+
+def _compile_filter_candidate_planes():
+    """
+    Compiles the numba implementation of filter_candidate_planes.
+
+    numba is imported here rather than with the module, so that scripts
+    that never filter planes in batch do not pay for its import.
+
+    Returns:
+        function or None: Compiled kernel, parallel over the planes, None if numba is not installed.
+    """
+
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def kernel(corners, planes):
+        n_planes = planes.shape[0]
+        mask     = np.empty(n_planes, dtype=np.bool_)
+
+        for i in prange(n_planes):
+            nx, ny, nz = planes[i, 3], planes[i, 4], planes[i, 5]
+            offset     = planes[i, 0]*nx + planes[i, 1]*ny + planes[i, 2]*nz
+
+            dmin = corners[0, 0]*nx + corners[0, 1]*ny + corners[0, 2]*nz - offset
+            dmax = dmin
+            for j in range(1, corners.shape[0]):
+                d    = corners[j, 0]*nx + corners[j, 1]*ny + corners[j, 2]*nz - offset
+                dmin = min(dmin, d)
+                dmax = max(dmax, d)
+
+            mask[i] = dmin * dmax <= 0
+
+        return mask
+
+    return kernel
+
+##########################################
+
+def filter_candidate_planes(corners, planes):
+    """
+    Selects the planes that cross a bounding box.
+
+    Only these planes can intersect the geometry inside the box, the others
+    can be skipped without any OCC computation. The check is compiled with
+    numba when it is installed, and vectorized with NumPy otherwise.
 
+    Parameters:
+        corners (numpy.ndarray): (8, 3) array with the corners of the box (see bbox_corners).
+        planes (numpy.ndarray): (N, 6) array of planes in point-normal form,
+            each row being x, y, z, nx, ny, nz.
+
+    Returns:
+        numpy.ndarray: (N,) boolean mask, True for the planes crossing the box.
+    """
+
+    global _filter_candidate_planes_numba
+
+    corners = np.ascontiguousarray(corners, dtype=np.float64)
+    planes  = np.ascontiguousarray(planes, dtype=np.float64).reshape(-1, 6)
+
+    if _filter_candidate_planes_numba is None:
+        _filter_candidate_planes_numba = _compile_filter_candidate_planes() or False
+
+    if _filter_candidate_planes_numba:
+        return _filter_candidate_planes_numba(corners, planes)
+
+    return _filter_candidate_planes_numpy(corners, planes)
+
+##########################################
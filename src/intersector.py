@@ -30,6 +30,7 @@ Outputs:
 
 import os
 import argparse
+import numpy as np
 import common_lib
 import step_file_lib
 
@@ -44,11 +45,11 @@ def main():
     2. Compute intersection of the plane with the geometry.
     3. If intersection exists:
         - Save intersection as a new STEP file.
-        - Visualize geometry and plane in a PNG image.
-    4. Logs OCC internal output to 'lib_occ.log' in the input file's folder.
+        - Visualize geometry and plane in a PNG image; a failure here is
+          reported but does not affect the STEP file.
+    4. Logs progress messages and OCC internal output to 'lib_occ.log' in the input file's folder.
 
     Raises:
-        argparse.ArgumentTypeError: If --in-plane does not contain exactly 6 floats.
         RuntimeError: If reading/writing STEP files fails, or intersection fails.
     """
 
@@ -57,7 +58,7 @@ def main():
     parser.add_argument("--in-step", required=True, help="Filepath of .stp file with the geometry under investigation",
         type=common_lib.check_file)
     
-    parser.add_argument("--in-plane", required=True, nargs='+', type=float,
+    parser.add_argument("--in-plane", required=True, nargs=6, type=float,
         help="Plane in a point-normal definition, 6 floats are required the first 3 are the point coordinates x, y, z and the rest 3 are the normal directions nx, ny, nz")
     
     parser.add_argument("--out-step", required=False,
@@ -68,28 +69,20 @@ def main():
     step_file       = args.in_step
     output_filename = args.out_step
 
-    if len(args.in_plane) != 6:
-        raise argparse.ArgumentTypeError("Exactly 6 numbers should be provided with argument --in-plane, the first 3 should be the point coordinates x, y, z and the rest 3 should be the normal directions nx, ny, nz")
-
-    plane_point     = args.in_plane[:3]       
-    plane_normal    = args.in_plane[3:]
+    # Point and normal are views on a single buffer
+    plane_definition = np.asarray(args.in_plane, dtype=np.float64)
+    plane_point      = plane_definition[:3]
+    plane_normal     = plane_definition[3:]
     
+    # Run OCC boolean operations on all cores
+    step_file_lib.enable_parallel_mode()
+
     output_log                         = common_lib.output_file_path(step_file, "lib_occ.log")
+    common_lib.log_to_file(output_log)
+
     shape, plane, result_shape, result = step_file_lib.find_intersection(step_file, plane_point, plane_normal)
 
     if result:
-        # Combine geometry with plane for visualization purposes
-        with common_lib.redirect_output(output_log):
-            dx, dy, dz  = step_file_lib.compute_dimensions(shape)
-            dimension   = max(dx, dy, dz)
-            display     = step_file_lib.combine_geometry_plane(shape, plane, dimension)
-
-            # Print geometry
-            root, name = os.path.split(step_file)
-            name, ext  = os.path.splitext(name)
-            output_png = common_lib.output_file_path(step_file, name+".png")
-            step_file_lib.plot_geometry(display, output_png)
-            
         # Write the result to a new STEP file
         output_file = common_lib.output_file_path(step_file, output_filename)
         status      = step_file_lib.write_step_geometry(result_shape, output_file)
@@ -98,6 +91,25 @@ def main():
             raise RuntimeError("Intersection found but failed to write STEP file: {}".format(output_file))
         else:
             print("Intersection found and written to: {}".format(output_filename))
+
+        # Combine geometry with plane for visualization purposes,
+        # a failure here must not discard the STEP file written above
+        root, name = os.path.split(step_file)
+        name, ext  = os.path.splitext(name)
+        output_png = common_lib.output_file_path(step_file, name+".png")
+
+        try:
+            with common_lib.redirect_output(output_log):
+                dx, dy, dz  = step_file_lib.compute_dimensions(shape)
+                dimension   = max(dx, dy, dz)
+                display     = step_file_lib.combine_geometry_plane(shape, plane, dimension)
+
+                # Print geometry
+                step_file_lib.plot_geometry(display, output_png)
+        except RuntimeError as error:
+            common_lib.logger.warning("The png file could not be written: {}".format(error))
+            print("The png file with the geometry and the plane could not be written, see: {}".format(output_log))
+        else:
             print("A png file with the geometry and the plane has been written to: {}".format(output_png))
 
     else:
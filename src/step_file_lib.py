@@ -4,43 +4,258 @@ This library provides utilities for working with STEP geometry using pythonocc-c
 
 Main features:
 - Read and write STEP files
-- Compute bounding box dimensions of a geometry
+- Cache the geometry of STEP files in binary BRep format
+- Compute bounding box and dimensions of a geometry
 - Create planes in point-normal form
-- Compute intersections between planes and geometry
-- Visualize shapes and save screenshots
+- Compute intersections between planes and geometry, for one or many planes
+- Visualize shapes offscreen and save screenshots
 
 Dependencies:
 - pythonocc-core
+- numpy
 - common_lib (local utility module for logging and output redirection)
 """
 
 ##########################################
 
-from OCC.Core.STEPControl import STEPControl_Reader, STEPControl_Writer, STEPControl_AsIs
+# The OCC modules only needed for visualization (OCCViewer, BRepMesh, AIS,
+# Quantity, Image, Graphic3d) are imported by the functions using them.
+
+from OCC.Core.STEPControl import STEPControl_Reader, STEPControl_Writer, STEPControl_Controller
+from OCC.Core.STEPControl import STEPControl_AsIs, STEPControl_ManifoldSolidBrep, STEPControl_GeometricCurveSet
 from OCC.Core.TopoDS import TopoDS_Shape
-from OCC.Display.SimpleGui import init_display
 from OCC.Core.gp import gp_Pnt, gp_Dir, gp_Pln
 from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Section
+from OCC.Core.BOPAlgo import BOPAlgo_Options
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeFace
-from OCC.Core.TopExp import TopExp_Explorer
-from OCC.Core.TopAbs import TopAbs_EDGE
+from OCC.Core.Geom import Geom_Plane
+from OCC.Core.TopExp import topexp, TopExp_Explorer
+from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+from OCC.Core.TopAbs import TopAbs_EDGE, TopAbs_FACE, TopAbs_SOLID
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.BRepBndLib import brepbndlib
+from OCC.Core.Interface import Interface_Static
+from OCC.Core.BinTools import bintools
 
 import os
+import json
+import math
+import numpy as np
 import common_lib
 
+__all__ = [
+    "enable_parallel_mode",
+    "parameters_from_environment",
+    "set_interface_parameters",
+    "disable_shape_healing",
+    "read_step_geometry",
+    "read_step_file",
+    "shape_cache_key",
+    "read_shape_cache",
+    "write_shape_cache",
+    "step_write_mode",
+    "write_step_geometry",
+    "compute_bounds",
+    "compute_dimensions",
+    "create_plane_point_normal",
+    "create_section_face",
+    "compute_section",
+    "plane_misses_bounds",
+    "has_edges",
+    "probe_intersection",
+    "build_full_intersection",
+    "find_intersection",
+    "find_intersections",
+    "make_offscreen_view",
+    "plot_geometry",
+    "create_face",
+    "combine_geometry_plane",
+]
+
 ##########################################
 
 global log_file 
 log_file = "lib_occ.log"
 
+# Extension of the binary BRep cache written next to each STEP file
+cache_extension = ".brepcache"
+
+# Extension appended to the cache file name for the key of the cached STEP file
+cache_key_extension = ".json"
+
+# Interface_Static parameters applied before reading a STEP file.
+# The defaults are those of OCCT, which keep the geometry of the file intact;
+# they are listed so that they can be tuned for speed at the cost of
+# fidelity. Each value can be overridden by an environment variable named
+# after the parameter, e.g. ICOMAT_READ_PRECISION_MODE=1 together with
+# ICOMAT_READ_PRECISION_VAL=0.01 to replace the precision of the file by a
+# coarser one, or ICOMAT_READ_STEP_SHAPE_RELATIONSHIP=0 to skip
+# SHAPE_REPRESENTATION_RELATIONSHIP entities (files relying on them to
+# link their geometry then read as empty).
+step_read_parameters = {
+    "read.precision.mode":          0,       # use the precision of the file
+    "read.precision.val":           0.0001,  # precision used if read.precision.mode is 1
+    "read.step.product.mode":       1,       # read product structure
+    "read.step.product.context":    1,       # take all products, whatever their context
+    "read.step.shape.relationship": 1,       # follow SHAPE_REPRESENTATION_RELATIONSHIP entities
+    "read.step.assembly.level":     1,       # translate all levels of assemblies
+    "read.step.nonmanifold":        0,       # read manifold topology only
+}
+
+# Interface_Static parameters applied before writing a STEP file,
+# they give smaller files that are faster to read back
+step_write_parameters = {
+    "write.step.schema":   "AP214IS",
+    "write.step.assembly": 0,
+}
+
+##########################################
+
+def enable_parallel_mode():
+    """
+    Enables the parallel (TBB) execution of OCC boolean operations.
+
+    The setting is global to the process, it should be called once at start.
+
+    Returns:
+        None
+    """
+
+    BOPAlgo_Options.SetParallelMode(True)
+
+    return
+
+##########################################
+
+def parameters_from_environment(parameters):
+    """
+    Overrides Interface_Static parameter values with environment variables.
+
+    The variable of a parameter is its name in upper case, with dots
+    replaced by underscores and prefixed with ICOMAT_, e.g.
+    ICOMAT_READ_PRECISION_VAL for "read.precision.val". Its value is
+    converted to the type of the default value.
+
+    Parameters:
+        parameters (dict): Parameter names mapped to their default values.
+
+    Returns:
+        dict: Parameter names mapped to the values to use.
+
+    Raises:
+        ValueError: If an environment variable cannot be converted to the type of the default value.
+    """
+
+    values = {}
+
+    for name, default in parameters.items():
+        variable = "ICOMAT_" + name.upper().replace(".", "_")
+        value    = os.environ.get(variable)
+
+        values[name] = default if value is None else type(default)(value)
+
+    return values
+
+##########################################
+
+def set_interface_parameters(parameters):
+    """
+    Sets OCC Interface_Static parameters used by the STEP translators.
+
+    Integer, float and string values are set with SetIVal, SetRVal and
+    SetCVal respectively. Parameters unknown to OCC are reported and skipped.
+
+    Parameters:
+        parameters (dict): Parameter names mapped to their values.
+
+    Returns:
+        None
+    """
+
+    for name, value in parameters.items():
+        if isinstance(value, bool) or isinstance(value, int):
+            status = Interface_Static.SetIVal(name, int(value))
+        elif isinstance(value, float):
+            status = Interface_Static.SetRVal(name, value)
+        else:
+            status = Interface_Static.SetCVal(name, str(value))
+
+        if not status:
+            common_lib.logger.warning("OCC parameter {} could not be set to {}".format(name, value))
+
+    return
+
+##########################################
+
+def disable_shape_healing(step_reader):
+    """
+    Switches off the optional shape healing of a STEP reader.
+
+    By default OCC runs ShapeFix_Shape on the transferred shapes. Readers
+    of OCC 7.8 and later expose SetShapeProcessFlags, and an empty set of
+    operations skips this processing. Older versions have no such API and
+    are left unchanged.
+
+    Parameters:
+        step_reader (STEPControl_Reader): Reader to configure, before TransferRoots.
+
+    Returns:
+        bool: True if the shape healing has been switched off.
+    """
+
+    if not hasattr(step_reader, "SetShapeProcessFlags"):
+        return False
+
+    try:
+        from OCC.Core.ShapeProcess import ShapeProcess_OperationsFlags
+        step_reader.SetShapeProcessFlags(ShapeProcess_OperationsFlags())
+    except (ImportError, TypeError, RuntimeError):
+        return False
+
+    return True
+
 ##########################################
 
 def read_step_geometry(step_filename):
+    """
+    Returns the TopoDS_Shape geometry of a STEP file.
+
+    The first time a STEP file is read its shape is stored in a binary BRep
+    cache next to it (see write_shape_cache). Later calls load the cache
+    instead of parsing the STEP file again, as long as the STEP file has
+    not been modified since (see shape_cache_key).
+
+    Parameters:
+        step_filename (str): Path to the STEP file.
+
+    Returns:
+        TopoDS_Shape: Loaded geometry shape.
+
+    Raises:
+        RuntimeError: If the STEP file cannot be read or contains no geometry.
+    """
+
+    shape = read_shape_cache(step_filename)
+
+    if shape is None:
+        shape = read_step_file(step_filename)
+        write_shape_cache(shape, step_filename)
+
+    return shape
+
+##########################################
+
+def read_step_file(step_filename):
     """
     Reads a STEP file and returns the TopoDS_Shape geometry.
 
+    The reader is configured with step_read_parameters, possibly overridden
+    by environment variables (see parameters_from_environment), before the
+    file is read. The optional shape healing (ShapeFix_Shape) run after the
+    transfer is switched off where the reader allows it (see
+    disable_shape_healing): the loading is faster, but a faulty file is
+    not repaired and may give a less robust intersection.
+
     Parameters:
         step_filename (str): Path to the STEP file.
 
@@ -53,34 +268,187 @@ def read_step_geometry(step_filename):
 
     output_log = common_lib.output_file_path(step_filename, log_file)
 
+    # All OCC calls share a single redirection to the log
     with common_lib.redirect_output(output_log):
+        # The reader initialises the STEP controller, which registers the
+        # read.step.* parameters; they are used from ReadFile on
         step_reader = STEPControl_Reader()
+        set_interface_parameters(parameters_from_environment(step_read_parameters))
+        healing_disabled = disable_shape_healing(step_reader)
         status = step_reader.ReadFile(step_filename)
+        if status == 1:
+            ok = step_reader.TransferRoots()
+            if ok:
+                shape = step_reader.OneShape()
+
+    if not healing_disabled:
+        common_lib.logger.info("Shape healing cannot be switched off with this OCC version, it runs on transfer")
+
     if status != 1:
         raise RuntimeError("Failed to read STEP file: {}".format(step_filename))
     else:
-        print("STEP file has been read sucessfully")
+        common_lib.logger.info("STEP file has been read sucessfully")
 
-    with common_lib.redirect_output(output_log):
-        ok = step_reader.TransferRoots()
     if not ok:
         raise RuntimeError("Failed to transfer STEP file contents.")
     else:
-        print("STEP file contents have been transfered sucessfully")
+        common_lib.logger.info("STEP file contents have been transfered sucessfully")
 
-    with common_lib.redirect_output(output_log):
-        shape = step_reader.OneShape()
-    if shape.IsNull():
+    # An empty compound is not null, it must not be used nor cached either
+    if shape.IsNull() or not TopExp_Explorer(shape, TopAbs_EDGE).More():
         raise RuntimeError("STEP file contains no geometry.")
 
     return shape
 
 ##########################################
 
+def shape_cache_key(step_filename):
+    """
+    Builds the key identifying the version of a STEP file a cache was made from.
+
+    The key includes the reader parameters in effect (see
+    parameters_from_environment), so changing them invalidates the cache.
+
+    Parameters:
+        step_filename (str): Path to the STEP file.
+
+    Returns:
+        dict: Absolute path, modification time and size of the STEP file,
+            and the reader parameters.
+    """
+
+    step_stat = os.stat(step_filename)
+
+    key = {
+        "path":       os.path.abspath(step_filename),
+        "mtime_ns":   step_stat.st_mtime_ns,
+        "size":       step_stat.st_size,
+        "parameters": parameters_from_environment(step_read_parameters),
+    }
+
+    return key
+
+##########################################
+
+def read_shape_cache(step_filename):
+    """
+    Loads the cached shape of a STEP file, if the cache is up to date.
+
+    The cache is valid only if the key stored next to it by write_shape_cache
+    equals the current shape_cache_key of the STEP file.
+
+    Parameters:
+        step_filename (str): Path to the STEP file.
+
+    Returns:
+        TopoDS_Shape or None: Cached geometry shape, None if there is no valid cache.
+    """
+
+    cache_file = step_filename + cache_extension
+    key_file   = cache_file + cache_key_extension
+
+    if not os.path.isfile(cache_file) or not os.path.isfile(key_file):
+        return None
+
+    try:
+        with open(key_file) as f:
+            cached_key = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached_key != shape_cache_key(step_filename):
+        return None
+
+    output_log = common_lib.output_file_path(step_filename, log_file)
+
+    # A truncated or corrupt cache may make OCC raise instead of returning False
+    try:
+        with common_lib.redirect_output(output_log):
+            shape = TopoDS_Shape()
+            ok    = bintools.Read(shape, cache_file)
+    except RuntimeError:
+        ok = False
+
+    if not ok or shape.IsNull():
+        common_lib.logger.warning("STEP geometry cache could not be read: {}".format(cache_file))
+        return None
+
+    common_lib.logger.info("STEP geometry has been loaded from cache: {}".format(cache_file))
+
+    return shape
+
+##########################################
+
+def write_shape_cache(shape, step_filename):
+    """
+    Stores a shape read from a STEP file in a binary BRep cache next to it.
+
+    The cache file is named after the STEP file with cache_extension appended,
+    and the shape_cache_key of the STEP file is written next to it as JSON.
+    Failing to write the cache is not an error, the STEP file is then parsed
+    on every run.
+
+    Parameters:
+        shape (TopoDS_Shape): Geometry read from the STEP file.
+        step_filename (str): Path to the STEP file.
+
+    Returns:
+        bool: True if the cache has been written.
+    """
+
+    cache_file = step_filename + cache_extension
+    key_file   = cache_file + cache_key_extension
+    output_log = common_lib.output_file_path(step_filename, log_file)
+
+    with common_lib.redirect_output(output_log):
+        ok = bintools.Write(shape, cache_file)
+
+    if ok:
+        try:
+            with open(key_file, "w") as f:
+                json.dump(shape_cache_key(step_filename), f)
+        except OSError:
+            ok = False
+
+    if not ok:
+        common_lib.logger.warning("STEP geometry could not be cached to: {}".format(cache_file))
+        return False
+
+    return True
+
+##########################################
+
+def step_write_mode(shape):
+    """
+    Selects the STEP representation that writes a shape with the least topology.
+
+    Parameters:
+        shape (TopoDS_Shape): The shape to export.
+
+    Returns:
+        STEPControl_StepModelType: STEPControl_GeometricCurveSet for shapes
+            without faces (e.g. intersection edges and wires),
+            STEPControl_ManifoldSolidBrep for solids and STEPControl_AsIs otherwise.
+    """
+
+    if shape.ShapeType() == TopAbs_SOLID:
+        return STEPControl_ManifoldSolidBrep
+
+    if not TopExp_Explorer(shape, TopAbs_FACE).More():
+        return STEPControl_GeometricCurveSet
+
+    return STEPControl_AsIs
+
+##########################################
+
 def write_step_geometry(shape, output_file):
     """
     Writes a TopoDS_Shape to a STEP file.
 
+    The STEP controller is initialised and configured with
+    step_write_parameters, then the shape is transferred with the
+    representation selected by step_write_mode.
+
     Parameters:
         shape (TopoDS_Shape): The shape to export.
         output_file (str): Destination STEP file path.
@@ -92,23 +460,31 @@ def write_step_geometry(shape, output_file):
     output_log = common_lib.output_file_path(output_file, log_file)
 
     with common_lib.redirect_output(output_log):
+        # The write.step.* parameters only exist once the STEP controller is
+        # initialised, which may not have happened yet if the shape was not
+        # read from a STEP file in this process
+        STEPControl_Controller.Init()
+        set_interface_parameters(step_write_parameters)
         step_writer = STEPControl_Writer()
-        step_writer.Transfer(shape, STEPControl_AsIs)
+        step_writer.Transfer(shape, step_write_mode(shape))
         status = step_writer.Write(output_file)
 
     return status
 
 ##########################################
 
-def compute_dimensions(shape):
+def compute_bounds(shape):
     """
-    Computes the dimensions (dx, dy, dz) of the bounding box of a shape.
+    Computes the bounding box limits of a shape.
+
+    The intersection functions take these limits as a parameter, so compute
+    them once per shape and pass them along.
 
     Parameters:
         shape (TopoDS_Shape): Geometry shape.
 
     Returns:
-        tuple: Dimensions (dx, dy, dz).
+        tuple: Limits (xmin, ymin, zmin, xmax, ymax, zmax).
     """
 
     # Compute bounding box
@@ -116,7 +492,29 @@ def compute_dimensions(shape):
     brepbndlib.Add(shape, bbox)
 
     # Get min and max coordinates
-    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    bounds = bbox.Get()
+
+    return bounds
+
+##########################################
+
+def compute_dimensions(shape, bounds=None):
+    """
+    Computes the dimensions (dx, dy, dz) of the bounding box of a shape.
+
+    Parameters:
+        shape (TopoDS_Shape): Geometry shape.
+        bounds (tuple, optional): Limits of the shape from compute_bounds,
+            computed if not given.
+
+    Returns:
+        tuple: Dimensions (dx, dy, dz).
+    """
+
+    if bounds is None:
+        bounds = compute_bounds(shape)
+
+    xmin, ymin, zmin, xmax, ymax, zmax = bounds
 
     # Dimensions
     dx = xmax - xmin
@@ -132,25 +530,192 @@ def create_plane_point_normal(plane_point, plane_normal):
     Creates a gp_Pln plane using a point and normal vector.
 
     Parameters:
-        plane_point (list or tuple): [x, y, z] coordinates of a point on the plane.
-        plane_normal (list or tuple): [nx, ny, nz] normal vector.
+        plane_point (list, tuple or numpy.ndarray): [x, y, z] coordinates of a point on the plane.
+        plane_normal (list, tuple or numpy.ndarray): [nx, ny, nz] normal vector.
 
     Returns:
         gp_Pln: Constructed plane.
     """
 
-    point  = gp_Pnt(*plane_point)
-    normal = gp_Dir(*plane_normal)
+    point  = gp_Pnt(float(plane_point[0]), float(plane_point[1]), float(plane_point[2]))
+    normal = gp_Dir(float(plane_normal[0]), float(plane_normal[1]), float(plane_normal[2]))
     plane  = gp_Pln(point, normal)
 
     return plane
 
 ##########################################
 
+def create_section_face(plane, bounds):
+    """
+    Creates a finite face on the plane that covers the given bounding box.
+
+    Sectioning against a bounded face instead of the infinite plane restricts
+    the intersection work of BRepAlgoAPI_Section to the region of the geometry.
+
+    Parameters:
+        plane (gp_Pln): The plane to create the face on.
+        bounds (tuple): Limits (xmin, ymin, zmin, xmax, ymax, zmax) to cover.
+
+    Returns:
+        TopoDS_Face: The created face.
+    """
+
+    xmin, ymin, zmin, xmax, ymax, zmax = bounds
+
+    # Half diagonal of the bounding box
+    radius = 0.5 * math.sqrt((xmax - xmin)**2 + (ymax - ymin)**2 + (zmax - zmin)**2)
+
+    # Distance between the plane origin and the centre of the bounding box
+    x0, y0, z0 = plane.Location().Coord()
+    offset     = math.sqrt((0.5*(xmin + xmax) - x0)**2 + (0.5*(ymin + ymax) - y0)**2 + (0.5*(zmin + zmax) - z0)**2)
+
+    # Any point of the box projects on the plane within this distance of its origin
+    size = 1.01 * (offset + radius) + 1e-6
+
+    face = BRepBuilderAPI_MakeFace(plane, -size, size, -size, size).Face()
+
+    return face
+
+##########################################
+
+def compute_section(shape, plane, bounds, approximation):
+    """
+    Computes the section of a shape by a plane with BRepAlgoAPI_Section.
+
+    The plane is bounded to the bounding box of the shape (see create_section_face).
+
+    Parameters:
+        shape (TopoDS_Shape): Geometry shape.
+        plane (gp_Pln): Plane.
+        bounds (tuple): Limits of the shape from compute_bounds.
+        approximation (bool): If True, the section curves are approximated
+            by BSplines and their pcurves on the shape are computed.
+
+    Returns:
+        TopoDS_Shape: Intersection geometry shape.
+
+    Raises:
+        RuntimeError: If the intersection computation fails.
+    """
+
+    face = create_section_face(plane, bounds)
+
+    section = BRepAlgoAPI_Section(shape, face, False)
+    section.SetRunParallel(True)
+    section.ComputePCurveOn1(approximation)
+    section.Approximation(approximation)
+    section.Build()
+
+    if not section.IsDone():
+        raise RuntimeError("Failed to compute intersection between plane and geometry.")
+
+    return section.Shape()
+
+##########################################
+
+def plane_misses_bounds(plane, bounds):
+    """
+    Checks whether a plane leaves the bounding box of a shape on one of its sides.
+
+    Parameters:
+        plane (gp_Pln): Plane.
+        bounds (tuple): Limits of the shape from compute_bounds.
+
+    Returns:
+        bool: True if the plane cannot intersect the shape; False otherwise.
+    """
+
+    point  = plane.Location().Coord()
+    normal = plane.Axis().Direction().Coord()
+
+    return common_lib.plane_misses_bbox(bounds, point, normal)
+
+##########################################
+
+def has_edges(section_shape):
+    """
+    Checks whether a section result contains edges.
+
+    Parameters:
+        section_shape (TopoDS_Shape): Result of compute_section.
+
+    Returns:
+        bool: True if the shape contains edges; False otherwise.
+    """
+
+    # Collect the edges of the section in a single call
+    edges = TopTools_IndexedMapOfShape()
+    topexp.MapShapes(section_shape, TopAbs_EDGE, edges)
+
+    return edges.Extent() > 0
+
+##########################################
+
+def probe_intersection(shape, plane, bounds=None):
+    """
+    Checks whether a plane intersects a shape, as cheaply as possible.
+
+    A plane that leaves all the corners of the bounding box on the same side
+    cannot intersect the shape. Otherwise the section is computed without
+    approximation nor pcurves and checked for edges. Use it when only the
+    existence of the intersection matters, not its geometry.
+
+    Parameters:
+        shape (TopoDS_Shape): Geometry shape.
+        plane (gp_Pln): Plane.
+        bounds (tuple, optional): Limits of the shape from compute_bounds,
+            computed if not given.
+
+    Returns:
+        bool: True if the intersection contains edges; False otherwise.
+
+    Raises:
+        RuntimeError: If the intersection computation fails.
+    """
+
+    if bounds is None:
+        bounds = compute_bounds(shape)
+
+    if plane_misses_bounds(plane, bounds):
+        return False
+
+    return has_edges(compute_section(shape, plane, bounds, False))
+
+##########################################
+
+def build_full_intersection(shape, plane, bounds=None):
+    """
+    Computes the intersection geometry of a shape and a plane for output.
+
+    The section curves are approximated and their pcurves are computed.
+
+    Parameters:
+        shape (TopoDS_Shape): Geometry shape.
+        plane (gp_Pln): Plane.
+        bounds (tuple, optional): Limits of the shape from compute_bounds,
+            computed if not given.
+
+    Returns:
+        TopoDS_Shape: Intersection geometry shape.
+
+    Raises:
+        RuntimeError: If the intersection computation fails.
+    """
+
+    if bounds is None:
+        bounds = compute_bounds(shape)
+
+    return compute_section(shape, plane, bounds, True)
+
+##########################################
+
 def find_intersection(step_filename, plane_point, plane_normal):
     """
     Computes the intersection between a STEP geometry and a plane.
 
+    Planes that miss the bounding box of the geometry are rejected before
+    any section is computed; otherwise a single full section is built.
+
     Parameters:
         step_filename (str): Path to the STEP file.
         plane_point (list or tuple): [x, y, z] coordinates of a point on the plane.
@@ -160,14 +725,12 @@ def find_intersection(step_filename, plane_point, plane_normal):
         tuple: (shape, plane, result_shape, result)
             - shape (TopoDS_Shape): Loaded geometry from STEP file.
             - plane (gp_Pln): Created plane.
-            - result_shape (TopoDS_Shape): Intersection geometry shape.
+            - result_shape (TopoDS_Shape): Intersection geometry shape, null if there is no intersection.
             - result (bool): True if intersection contains edges; False otherwise.
 
     Raises:
         RuntimeError: If the STEP file cannot be read or intersection computation fails.
     """
-    
-    result = False
 
     # Load STEP file
     shape = read_step_geometry(step_filename)
@@ -178,46 +741,139 @@ def find_intersection(step_filename, plane_point, plane_normal):
     # Compute intersection using BRepAlgoAPI_Section
     output_log = common_lib.output_file_path(step_filename, log_file)
 
-    with common_lib.redirect_output(output_log):
-        section = BRepAlgoAPI_Section(shape, plane, True)
-        section.ComputePCurveOn1(True)
-        section.Approximation(True)
-        section.Build()
+    result       = False
+    result_shape = TopoDS_Shape()
 
-    if not section.IsDone():
-        raise RuntimeError("Failed to compute intersection between plane and geometry.")
-    else:
-        print("Computation of intersection finished sucessfully")
+    bounds = compute_bounds(shape)
 
-    # Check if intersection result is not empty
-    with common_lib.redirect_output(output_log):
-        result_shape = section.Shape()
-        explorer = TopExp_Explorer(result_shape, TopAbs_EDGE)
-        has_edges = explorer.More() 
+    if not plane_misses_bounds(plane, bounds):
+        with common_lib.redirect_output(output_log):
+            section_shape = build_full_intersection(shape, plane, bounds)
+
+        if has_edges(section_shape):
+            result       = True
+            result_shape = section_shape
 
-    if has_edges:
-        result = True
+    common_lib.logger.info("Computation of intersection finished sucessfully")
     
     return shape, plane, result_shape, result
 
 ##########################################
 
+def find_intersections(step_filename, planes):
+    """
+    Computes the intersections between a STEP geometry and several planes.
+
+    The planes that do not cross the bounding box of the geometry are
+    discarded at once with common_lib.filter_candidate_planes; a single
+    full section is built for each of the others, as in find_intersection.
+
+    Parameters:
+        step_filename (str): Path to the STEP file.
+        planes (array-like): (N, 6) planes in point-normal form, each row being x, y, z, nx, ny, nz.
+
+    Returns:
+        tuple: (shape, intersections)
+            - shape (TopoDS_Shape): Loaded geometry from STEP file.
+            - intersections (list): (plane, result_shape, result) for each plane, as returned by find_intersection.
+
+    Raises:
+        RuntimeError: If the STEP file cannot be read or intersection computation fails.
+    """
+
+    # Load STEP file
+    shape = read_step_geometry(step_filename)
+
+    planes     = np.asarray(planes, dtype=np.float64).reshape(-1, 6)
+    bounds     = compute_bounds(shape)
+    corners    = common_lib.bbox_corners(bounds)
+    candidates = common_lib.filter_candidate_planes(corners, planes)
+
+    intersections = []
+    output_log    = common_lib.output_file_path(step_filename, log_file)
+
+    with common_lib.redirect_output(output_log):
+        for plane_definition, candidate in zip(planes, candidates):
+            plane        = create_plane_point_normal(plane_definition[:3], plane_definition[3:])
+            result       = False
+            result_shape = TopoDS_Shape()
+
+            # Candidates already passed the bounding box test
+            if candidate:
+                section_shape = build_full_intersection(shape, plane, bounds)
+
+                if has_edges(section_shape):
+                    result       = True
+                    result_shape = section_shape
+
+            intersections.append((plane, result_shape, result))
+
+    common_lib.logger.info("Computation of intersections finished sucessfully")
+
+    return shape, intersections
+
+##########################################
+
+def make_offscreen_view(width, height):
+    """
+    Creates an offscreen OCC viewer of the given size.
+
+    The viewer renders into an offscreen buffer, so no GUI backend,
+    window or event loop is initialized.
+
+    Parameters:
+        width (int): Width of the rendered image in pixels.
+        height (int): Height of the rendered image in pixels.
+
+    Returns:
+        Viewer3d: Offscreen display object.
+    """
+
+    from OCC.Display.OCCViewer import Viewer3d
+
+    display = Viewer3d()
+    display.Create(display_glinfo=False)
+    display.SetSize(width, height)
+    display.SetModeShaded()
+
+    return display
+
+##########################################
+
 def plot_geometry(display, output):
     """
     Renders the display scene and saves a screenshot to a PNG file.
 
+    The view is rendered directly into an OCC pixmap of the size of its
+    window (see make_offscreen_view), which is encoded and written by OCC
+    itself.
+
     Parameters:
-        display: Display object returned by init_display().
+        display: Display object returned by make_offscreen_view().
         output (str): Path to save the PNG image.
 
     Returns:
         None
+
+    Raises:
+        RuntimeError: If the view cannot be rendered or the image cannot be written.
     """
 
+    from OCC.Core.Image import Image_AlienPixMap
+    from OCC.Core.Graphic3d import Graphic3d_BT_RGB
+
     display.FitAll()
-    display.Repaint()
 
-    display.ExportToImage(output)
+    # Same size as the view, so the image keeps its aspect ratio
+    width, height = display.View.Window().Size()
+
+    pixmap = Image_AlienPixMap()
+
+    if not display.View.ToPixMap(pixmap, width, height, Graphic3d_BT_RGB):
+        raise RuntimeError("Failed to render the geometry view.")
+
+    if not pixmap.Save(output):
+        raise RuntimeError("Failed to write PNG file: {}".format(output))
 
     return
 
@@ -241,28 +897,46 @@ def create_face(plane, dimension):
 
 ##########################################
 
-def combine_geometry_plane(shape, plane, dimension):
+def combine_geometry_plane(shape, plane, dimension, width=1024, height=768):
     """
-    Displays the STEP shape together with a finite face representing the plane.
+    Displays the STEP shape together with a finite square representing the plane.
+
+    The plane is drawn by an AIS_Plane presentation of the underlying
+    Geom_Plane, so no topological face is built (create_face remains
+    available when a face is needed).
 
     Parameters:
         shape (TopoDS_Shape): Geometry shape.
         plane (gp_Pln): Plane.
-        dimension (float): Half-size of the plane face.
+        dimension (float): Half-size of the displayed plane.
+        width (int): Width of the rendered image in pixels.
+        height (int): Height of the rendered image in pixels.
 
     Returns:
-        display: Display object from init_display() for further use.
+        display: Display object from make_offscreen_view() for further use.
     """
 
-    # Make a finite face on the plane for visualization purposes
-    face = create_face(plane, dimension)
+    from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+    from OCC.Core.AIS import AIS_Plane
+    from OCC.Core.Quantity import Quantity_Color, Quantity_NOC_LIGHTBLUE
+
+    # Tessellate in parallel with the deflection AIS would use by default
+    # (deviation coefficient 0.001 of 4 times the largest extent), so the
+    # presentation reuses this mesh instead of refining it
+    BRepMesh_IncrementalMesh(shape, dimension*4e-3, False, 0.5, True)
+
+    # Presentation of the plane for visualization purposes
+    ais_plane = AIS_Plane(Geom_Plane(plane))
+    ais_plane.SetSize(2*dimension)
+    ais_plane.SetColor(Quantity_Color(Quantity_NOC_LIGHTBLUE))
+    ais_plane.SetTransparency(0.2)
 
     # Initialize the viewer
-    display, start_display, _, _ = init_display()
+    display = make_offscreen_view(width, height)
 
-    # Display both: STEP shape and plane face
-    display.DisplayShape(shape, update=True)
-    display.DisplayShape(face, update=True, color='LIGHTBLUE', transparency=0.2)
+    # Display both: STEP shape and plane, the scene is rendered once by plot_geometry
+    display.DisplayShape(shape, update=False)
+    display.Context.Display(ais_plane, False)
 
     return display
 
@@ -271,3 +945,4 @@ def combine_geometry_plane(shape, plane, dimension):
 
 
 
+